@@ -1,9 +1,15 @@
 import os
 import math
 import json
-from collections import deque
-# Assumimos que CompactTrie é importado do seu módulo
-from compact_trie import CompactTrie 
+import operator
+from collections import OrderedDict
+try:
+    # Parser JSON implementado em C (opcional); sem ele, usa o json da biblioteca padrão
+    import orjson
+except ImportError:
+    orjson = None
+# As consultas usam a visão somente leitura (mapeada em memória) da CompactTrie salva
+from compact_trie import FlatTrie
 
 # --- Definição das Precedências de Operadores para Shunting-Yard ---
 OP_PRECEDENCE = {
@@ -13,21 +19,47 @@ OP_PRECEDENCE = {
     ')': 0
 }
 
+# --- Operações Booleanas sobre bitmaps de DocIDs (AND = interseção, OR = união) ---
+BOOLEAN_OPERATIONS = {
+    'AND': operator.and_,
+    'OR': operator.or_
+}
+
+# Quantidade máxima de consultas cujos resultados ranqueados ficam em cache (LRU)
+RESULT_CACHE_SIZE = 1024
+
+# Quantidade máxima de termos cujos bitmaps de DocIDs ficam em cache (LRU)
+BITMAP_CACHE_SIZE = 1024
+
 class InformationRetriever:
     """
     Processa consultas booleanas e ranqueia documentos por Z-score.
     """
-    def __init__(self, trie_file="inverted_index.txt", stats_file="global_stats.json"):
-        self.trie = CompactTrie()
-        self.global_stats = {}
+    def __init__(self, trie_file="inverted_index.bin", stats_file="global_stats.json"):
+        self.trie = FlatTrie()
+        # Estatísticas globais já desempacotadas: termo -> (mu, sigma)
+        self._term_stats: dict[str, tuple] = {}
         self.is_ready = False
 
+
+        # Bitmaps de DocIDs já construídos (termo -> int), reaproveitados entre
+        # consultas, em ordem LRU e limitados a BITMAP_CACHE_SIZE termos
+        self._bitmaps: OrderedDict = OrderedDict()
+
+        # Resultados completos por consulta normalizada (tupla de tokens -> (DocIDs
+        # ranqueados, termos da consulta)), em ordem LRU: repetir a mesma consulta
+        # (ex.: paginação) não refaz a avaliação booleana nem o ranqueamento.
+        self._result_cache: OrderedDict = OrderedDict()
+
         # 1. Carregar Índice e Estatísticas
         if self._load_data(trie_file, stats_file):
             self.is_ready = True
         
     def _load_data(self, trie_file, stats_file):
         """Carrega a Trie e as estatísticas de Z-score do disco."""
+        # Um novo índice invalida tudo o que foi calculado sobre o anterior
+        self._bitmaps.clear()
+        self._result_cache.clear()
         
         # Tenta carregar a Trie (omissão de código de erro por brevidade)
         if not self.trie.load_from_file(trie_file):
@@ -36,15 +68,24 @@ class InformationRetriever:
             
         # Tenta carregar as Estatísticas
         try:
-            with open(stats_file, 'r', encoding='utf-8') as f:
-                self.global_stats = json.load(f)
+            with open(stats_file, 'rb') as f:
+                raw_stats = f.read()
+            global_stats = orjson.loads(raw_stats) if orjson else json.loads(raw_stats)
+
+            # Desempacota (mu, sigma) uma única vez, em vez de indexar o
+            # dicionário de cada termo a cada cálculo de Z-score. O dicionário
+            # completo (com 'df') não é mantido em memória.
+            self._term_stats = {
+                term: (stats['mu'], stats['sigma'])
+                for term, stats in global_stats.items()
+            }
             return True
         except (FileNotFoundError, json.JSONDecodeError):
             print(f"ERRO: Falha ao carregar as estatísticas de Z-score do arquivo {stats_file}.")
             return False
 
     # ====================================================================
-    # LÓGICA BOOLEANA (SHUNTING-YARD E AVALIAÇÃO RPN)
+    # LÓGICA BOOLEANA (SHUNTING-YARD COM AVALIAÇÃO EM UMA PASSADA)
     # ====================================================================
 
     def _tokenize_query(self, query: str) -> list:
@@ -64,67 +105,89 @@ class InformationRetriever:
                     processed_tokens.append(token.lower())
         return processed_tokens
 
-    def _to_rpn(self, tokens: list) -> list:
-        """Converte tokens da consulta para Notação Polonesa Reversa (RPN) usando Shunting-Yard."""
-        output = []
-        operator_stack = deque()
+    def _to_bitmap(self, doc_ids) -> int:
+        """
+        Converte uma lista de DocIDs em um bitmap: o bit i do inteiro está ligado
+        se, e somente se, o DocID i está na lista.
+        """
+        if not doc_ids:
+            return 0
+        bits = bytearray((max(doc_ids) >> 3) + 1)
+        for doc_id in doc_ids:
+            bits[doc_id >> 3] |= 1 << (doc_id & 7)
+        return int.from_bytes(bits, 'little')
+
+    def _from_bitmap(self, bitmap: int) -> list:
+        """Converte um bitmap de volta para a lista ordenada de DocIDs."""
+        # bin() escreve o bit mais significativo primeiro; invertida, a posição
+        # de cada '1' na string é exatamente o DocID.
+        bits = bin(bitmap)[:1:-1]
+        doc_ids = []
+        pos = bits.find('1')
+        while pos != -1:
+            doc_ids.append(pos)
+            pos = bits.find('1', pos + 1)
+        return doc_ids
+
+    def _apply_operation(self, operator_token: str, operand_stack: list):
+        """Aplica um operador booleano aos dois bitmaps do topo da pilha de operandos."""
+        operation = BOOLEAN_OPERATIONS.get(operator_token)
+        if operation is None:
+            # Parêntese sem par que sobrou na pilha de operadores: ignorado
+            return
+
+        if len(operand_stack) < 2: raise ValueError(f"Consulta {operator_token} mal formada.")
+        # O resultado substitui o primeiro operando no topo da pilha
+        bitmap2 = operand_stack.pop()
+        operand_stack[-1] = operation(operand_stack[-1], bitmap2)
+
+    def _evaluate(self, tokens: list, query_cache: dict) -> list:
+        """
+        Avalia a consulta em uma única passada e retorna a lista ordenada final de DocIDs.
+        É o Shunting-Yard sem a fila de saída: cada operador é aplicado aos operandos
+        no mesmo instante em que seria emitido para a RPN.
+        """
+        # Os operandos são bitmaps (inteiros): AND e OR viram '&' e '|',
+        # executados palavra a palavra em C pelo próprio interpretador.
+        operand_stack = []
+        push_operand = operand_stack.append
+        apply_operation = self._apply_operation
+
+        # Pilha (lista) de pares (precedência, operador): a precedência do topo
+        # fica à mão, sem consultar OP_PRECEDENCE dentro do laço de desempilhamento.
+        operator_stack = []
+        push_operator = operator_stack.append
+        pop_operator = operator_stack.pop
 
         for token in tokens:
-            if token not in OP_PRECEDENCE:
-                # É um termo
-                output.append(token)
+            precedence = OP_PRECEDENCE.get(token)
+            if precedence is None:
+                # É um termo: empilha o bitmap de DocIDs (já no cache da consulta)
+                push_operand(query_cache[token][0])
             elif token == '(':
                 # Abre parêntese
-                operator_stack.append(token)
+                push_operator((precedence, token))
             elif token == ')':
-                # Fecha parêntese: desempilha operadores até encontrar o '('
-                while operator_stack and operator_stack[-1] != '(':
-                    output.append(operator_stack.pop())
-                if operator_stack and operator_stack[-1] == '(':
-                    operator_stack.pop() # Remove o '('
+                # Fecha parêntese: aplica os operadores até encontrar o '('
+                while operator_stack and operator_stack[-1][1] != '(':
+                    apply_operation(pop_operator()[1], operand_stack)
+                if operator_stack:
+                    pop_operator() # Remove o '('
             else:
-                # É um operador (AND ou OR)
-                while (operator_stack and operator_stack[-1] != '(' and 
-                       OP_PRECEDENCE.get(operator_stack[-1], 0) >= OP_PRECEDENCE[token]):
-                    output.append(operator_stack.pop())
-                operator_stack.append(token)
+                # É um operador (AND ou OR). Como '(' tem precedência 0, ele
+                # naturalmente interrompe o desempilhamento.
+                while operator_stack and operator_stack[-1][0] >= precedence:
+                    apply_operation(pop_operator()[1], operand_stack)
+                push_operator((precedence, token))
 
-        # Desempilha os operadores restantes
+        # Aplica os operadores restantes
         while operator_stack:
-            output.append(operator_stack.pop())
-            
-        return output
-
-    def _evaluate_rpn(self, rpn_tokens: list) -> set:
-        """Avalia a consulta RPN e retorna o conjunto final de DocIDs."""
-        operand_stack = deque()
-
-        for token in rpn_tokens:
-            if token not in OP_PRECEDENCE:
-                # Operando: Recupera o conjunto de DocIDs (o índice invertido)
-                # O índice invertido é uma lista de (DocID, TF), precisamos apenas dos DocIDs
-                index_list = self.trie.find(token)
-                doc_ids = {doc_id for doc_id, tf in index_list}
-                operand_stack.append(doc_ids)
-            
-            elif token == 'AND':
-                # Operação AND: Interseção de conjuntos
-                if len(operand_stack) < 2: raise ValueError("Consulta AND mal formada.")
-                set2 = operand_stack.pop()
-                set1 = operand_stack.pop()
-                operand_stack.append(set1.intersection(set2))
-                
-            elif token == 'OR':
-                # Operação OR: União de conjuntos
-                if len(operand_stack) < 2: raise ValueError("Consulta OR mal formada.")
-                set2 = operand_stack.pop()
-                set1 = operand_stack.pop()
-                operand_stack.append(set1.union(set2))
+            apply_operation(pop_operator()[1], operand_stack)
 
         if len(operand_stack) != 1:
             raise ValueError("Consulta Booleana inválida ou ambígua.")
             
-        return operand_stack.pop()
+        return self._from_bitmap(operand_stack.pop())
 
     # ====================================================================
     # RANQUEAMENTO POR Z-SCORE
@@ -132,12 +195,11 @@ class InformationRetriever:
     
     def _calculate_z_score(self, tf: int, term: str) -> float:
         """Calcula o Z-score de um termo para um dado TF, usando estatísticas globais."""
-        stats = self.global_stats.get(term)
-        if not stats:
+        stats = self._term_stats.get(term)
+        if stats is None:
             return 0.0
         
-        mu = stats['mu']
-        sigma = stats['sigma']
+        mu, sigma = stats
         
         if sigma <= 0:
             # Evita divisão por zero. Se o desvio é zero, o termo sempre tem a mesma freq.
@@ -146,37 +208,33 @@ class InformationRetriever:
         
         return (tf - mu) / sigma
 
-    def _rank_results(self, doc_ids: set, query_terms: set) -> list:
+    def _rank_results(self, doc_ids: list, query_terms: list, query_cache: dict) -> list:
         """Calcula a relevância (média dos Z-scores) e ordena os DocIDs."""
-        ranked_docs = [] # Lista de (relevância, doc_id)
+        # Acumula por termo (e não por documento): cada termo visita apenas os
+        # DocIDs candidatos que de fato o contêm.
+        total_z_scores = {} # doc_id -> soma dos Z-scores
+        term_counts = {}    # doc_id -> quantidade de termos da consulta no documento
+        get_total = total_z_scores.get
+        get_count = term_counts.get
+        calculate_z_score = self._calculate_z_score
 
-        for doc_id in doc_ids:
-            total_z_score = 0.0
-            term_count = 0
+        for term in query_terms:
+            _, postings_dict = query_cache[term]
+            # O Z-score só depende de (termo, TF): é calculado uma vez por TF distinto
+            z_by_tf = {}
             
-            for term in query_terms:
-                # 1. Encontrar o TF do termo neste DocID
-                index_list = self.trie.find(term)
-                
-                # O (DocID, TF) é armazenado na Trie. Procuramos o TF correspondente.
-                tf = next((t for d, t in index_list if d == doc_id), 0)
-                
-                if tf > 0:
-                    # 2. Calcular Z-score
-                    z_score = self._calculate_z_score(tf, term)
-                    total_z_score += z_score
-                    term_count += 1
-            
-            if term_count > 0:
-                # 3. Relevância = Média dos Z-scores
-                relevance = total_z_score / term_count
-                ranked_docs.append((relevance, doc_id))
+            # 1. Interseção (feita em C) entre os candidatos e os DocIDs do termo
+            for doc_id in postings_dict.keys() & doc_ids:
+                # 2. Calcular Z-score
+                tf = postings_dict[doc_id]
+                z_score = z_by_tf.get(tf)
+                if z_score is None:
+                    z_score = z_by_tf[tf] = calculate_z_score(tf, term)
+                total_z_scores[doc_id] = get_total(doc_id, 0.0) + z_score
+                term_counts[doc_id] = get_count(doc_id, 0) + 1
 
-        # Ordenar em ordem decrescente de relevância
-        ranked_docs.sort(key=lambda x: x[0], reverse=True)
-        
-        # Retorna apenas a lista de DocIDs ordenados
-        return [doc_id for relevance, doc_id in ranked_docs]
+        # 3. Relevância = Média dos Z-scores, em ordem decrescente (empates por DocID crescente)
+        return sorted(total_z_scores, key=lambda d: (-total_z_scores[d] / term_counts[d], d))
 
     # ====================================================================
     # FUNÇÃO PRINCIPAL
@@ -184,28 +242,67 @@ class InformationRetriever:
 
     def search(self, query: str) -> list:
         """Executa a busca booleana e ranqueada."""
+        return self.search_with_terms(query)[0]
+
+    def search_with_terms(self, query: str) -> tuple:
+        """
+        Executa a busca booleana e ranqueada e retorna (DocIDs ranqueados, termos
+        distintos da consulta na ordem em que aparecem).
+        """
         if not self.is_ready:
-            return []
+            return [], []
 
         try:
             # 1. Pré-processamento e extração de termos
             tokens = self._tokenize_query(query)
-            query_terms = {t for t in tokens if t not in OP_PRECEDENCE}
+
+            # A tupla de tokens já é a consulta normalizada (termos em minúsculas,
+            # espaços e parênteses uniformizados)
+            cache_key = tuple(tokens)
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+                ranked_doc_ids, query_terms = cached
+                return list(ranked_doc_ids), list(query_terms)
+
+            # Termos distintos, na ordem em que aparecem (lista fixa para os laços seguintes)
+            query_terms = list(dict.fromkeys(t for t in tokens if t not in OP_PRECEDENCE))
+
+            # Cache da consulta: termo -> (bitmap de DocIDs, dicionário {DocID: TF}).
+            # Cada termo é buscado na Trie uma única vez, e não de novo na avaliação
+            # booleana e no ranqueamento.
+            query_cache = {}
+            find_postings = self.trie.find_postings
+            bitmaps = self._bitmaps
+            for term in query_terms:
+                # Colunas (DocIDs, TFs) do índice invertido, sem tuplas intermediárias
+                doc_ids, frequencies = find_postings(term)
+                bitmap = bitmaps.get(term)
+                if bitmap is None:
+                    bitmap = bitmaps[term] = self._to_bitmap(doc_ids)
+                    if len(bitmaps) > BITMAP_CACHE_SIZE:
+                        bitmaps.popitem(last=False) # Descarta o termo menos recente
+                else:
+                    bitmaps.move_to_end(term)
+                query_cache[term] = (bitmap, dict(zip(doc_ids, frequencies)))
             
-            # 2. Conversão para RPN e Avaliação Booleana
-            rpn_tokens = self._to_rpn(tokens)
-            matching_doc_ids = self._evaluate_rpn(rpn_tokens)
+            # 2. Avaliação Booleana (sem gerar a RPN intermediária)
+            matching_doc_ids = self._evaluate(tokens, query_cache)
             
-            if not matching_doc_ids:
-                return []
-                
             # 3. Ranqueamento
-            # Retorna a lista de DocIDs ordenada por relevância
-            return self._rank_results(matching_doc_ids, query_terms)
+            # Lista de DocIDs ordenada por relevância
+            ranked_doc_ids = []
+            if matching_doc_ids:
+                ranked_doc_ids = self._rank_results(matching_doc_ids, query_terms, query_cache)
+
+            self._result_cache[cache_key] = (tuple(ranked_doc_ids), tuple(query_terms))
+            if len(self._result_cache) > RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False) # Descarta a consulta menos recente
+            return ranked_doc_ids, query_terms
         
         except ValueError as e:
             print(f"ERRO DE CONSULTA: {e}")
-            return []
+            return [], []
 
 
 # --- Exemplo de Uso (Simulação) ---
@@ -227,20 +324,20 @@ if __name__ == '__main__':
         # Ranqueamento: Doc 1 (TF 'carro'=2, TF 'azul'=1) vs Doc 2 (TF 'carro'=1, TF 'verde'=1)
         # O Doc 1 deve ser mais relevante porque o TF do termo 'carro' é maior.
         
-        ranked_doc_ids = ir.search(test_query)
+        ranked_doc_ids, query_terms = ir.search_with_terms(test_query)
         
         if ranked_doc_ids:
             print(f"Resultados Ordenados (DocIDs): {ranked_doc_ids}")
             print("\n--- Detalhe do Ranqueamento (apenas para debug) ---")
             
-            # Recalcula e mostra a relevância do primeiro resultado
+            # Recalcula e mostra a relevância do primeiro resultado, reaproveitando
+            # os termos que a própria busca já extraiu (sem tokenizar de novo)
             doc_id = ranked_doc_ids[0]
-            query_terms = {t for t in ir._tokenize_query(test_query) if t not in OP_PRECEDENCE}
             
             total_z = 0
             for term in query_terms:
-                index_list = ir.trie.find(term)
-                tf = next((t for d, t in index_list if d == doc_id), 0)
+                doc_ids, frequencies = ir.trie.find_postings(term)
+                tf = dict(zip(doc_ids, frequencies)).get(doc_id, 0)
                 if tf > 0:
                     z = ir._calculate_z_score(tf, term)
                     print(f"  Doc {doc_id} | Termo '{term}': TF={tf}, Z-score={z:.4f}")
@@ -1,7 +1,29 @@
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from operator import itemgetter
+
+# --- Formato binário do índice (ver FlatTrie) ---
+FLAT_MAGIC = b'CTRI'
+FLAT_VERSION = 1
+# magic, versão, nº de nós, nº de ocorrências, tamanho do bloco de rótulos
+FLAT_HEADER = struct.Struct('=4sIIII')
+
+# Resultado de find_postings para palavras ausentes: um único par de colunas vazias,
+# somente leitura, compartilhado (evita alocar dois arrays a cada busca sem sucesso)
+_EMPTY_COLUMN = memoryview(array('I')).toreadonly()
+_NO_POSTINGS = (_EMPTY_COLUMN, _EMPTY_COLUMN)
+
 class TrieNode:
     """
     Representa um nó na Árvore Trie Compacta.
     """
+    # Sem __dict__ por instância: a Trie tem muitos nós e isto reduz a memória
+    # de cada um e acelera o acesso aos atributos.
+    __slots__ = ('label', 'children', 'is_terminal', 'doc_ids', 'frequencies')
+    
     def __init__(self):
         # O rótulo (prefixo/sub-string) que este nó representa no caminho
         self.label = ""
@@ -15,9 +37,16 @@ class TrieNode:
         # no corpus.
         self.is_terminal = False
         
-        # O Índice Invertido para o termo.
-        # Deve armazenar a lista de ocorrências: [(DocID, Frequência), ...]
-        self.inverted_index = []
+        # O Índice Invertido para o termo, em duas colunas paralelas de inteiros
+        # sem sinal de 32 bits (em vez de uma lista de tuplas (DocID, Frequência)):
+        # a i-ésima ocorrência é (doc_ids[i], frequencies[i]).
+        self.doc_ids = array('I')
+        self.frequencies = array('I')
+
+    @property
+    def inverted_index(self) -> list:
+        """Visão de compatibilidade no formato antigo: [(DocID, Frequência), ...]."""
+        return list(zip(self.doc_ids, self.frequencies))
 
 class CompactTrie:
     """
@@ -27,15 +56,23 @@ class CompactTrie:
         # O nó raiz, que geralmente não armazena um rótulo e atua como ponto de partida.
         self.root = TrieNode()
         
-    def _find_mismatch_point(self, word, label):
+    def _find_mismatch_point(self, word, label, start=0):
         """
-        Função auxiliar para encontrar o ponto onde a 'word' e o 'label' de um nó
-        deixam de ser iguais (o maior prefixo comum).
-        Retorna o índice onde a discordância ocorre.
+        Função auxiliar para encontrar o ponto onde a 'word' (a partir da posição
+        'start') e o 'label' de um nó deixam de ser iguais (o maior prefixo comum).
+        Retorna o índice, relativo a 'start', onde a discordância ocorre.
         """
+        # Casos mais comuns (rótulo prefixo da palavra, ou o contrário), resolvidos
+        # com uma única comparação em C em vez de caractere por caractere.
+        if word.startswith(label, start):
+            return len(label)
+        remaining_length = len(word) - start
+        if remaining_length < len(label) and label.startswith(word[start:]):
+            return remaining_length
+        
         i = 0
-        min_len = min(len(word), len(label))
-        while i < min_len and word[i] == label[i]:
+        min_len = min(remaining_length, len(label))
+        while i < min_len and word[start + i] == label[i]:
             i += 1
         return i
 
@@ -43,52 +80,79 @@ class CompactTrie:
         """
         Insere uma palavra na Trie e atualiza seu índice invertido.
         """
+        node = self._insert_node(word)
+        if node is not None:
+            node.doc_ids.append(doc_id)
+            node.frequencies.append(frequency)
+
+    def insert_many(self, postings):
+        """
+        Insere várias palavras de uma vez, cada uma com o seu índice invertido completo.
+        'postings' é um iterável de (palavra, doc_ids, frequencies). Cada palavra
+        percorre a Trie uma única vez (em vez de uma vez por documento), e a inserção
+        em ordem alfabética faz os prefixos chegarem antes das palavras que os estendem.
+        """
+        for word, doc_ids, frequencies in sorted(postings, key=itemgetter(0)):
+            node = self._insert_node(word)
+            if node is not None:
+                node.doc_ids.extend(doc_ids)
+                node.frequencies.extend(frequencies)
+
+    def _insert_node(self, word: str):
+        """
+        Garante que a palavra exista na Trie (com os splits necessários) e retorna
+        o seu nó terminal, onde o índice invertido deve ser atualizado.
+        Retorna None para a palavra vazia.
+        """
         current_node = self.root
-        remaining_word = word
+        # Em vez de fatiar a palavra a cada descida, avançamos uma posição sobre
+        # ela: o restante da palavra é word[pos:], fatiado só ao criar um nó.
+        pos = 0
+        word_length = len(word)
         
-        while remaining_word:
-            char = remaining_word[0]
+        while pos < word_length:
+            char = word[pos]
+            remaining_length = word_length - pos
             
             if char not in current_node.children:
                 # Caso 1: Não há caminho para este caractere. (Inserção simples)
                 new_node = TrieNode()
-                new_node.label = remaining_word
+                new_node.label = word[pos:]
                 new_node.is_terminal = True
-                new_node.inverted_index.append((doc_id, frequency))
                 
                 current_node.children[char] = new_node
-                return
+                return new_node
             
             child_node = current_node.children[char]
             child_label = child_node.label
             
-            mismatch_idx = self._find_mismatch_point(remaining_word, child_label)
+            # Caso mais comum (rótulo inteiro é prefixo do restante), sem chamada de função
+            if word.startswith(child_label, pos):
+                mismatch_idx = len(child_label)
+            else:
+                mismatch_idx = self._find_mismatch_point(word, child_label, pos)
             
             # ----------------------------------------------------
             # A. Match Exato: Word == child_label
             # Este é o caso que causava o erro no Cenário 8.
             # ----------------------------------------------------
-            if mismatch_idx == len(remaining_word) and mismatch_idx == len(child_label):
+            if mismatch_idx == remaining_length and mismatch_idx == len(child_label):
                 # A palavra já existe no caminho do nó. Apenas atualiza o índice.
                 
                 # Marca como terminal (caso não estivesse, se foi o resultado de um split)
                 child_node.is_terminal = True 
-                
-                # Adiciona o novo DocID e Frequência
-                child_node.inverted_index.append((doc_id, frequency))
-                return
+                return child_node
             
             # ----------------------------------------------------
             # B. Word é Prefixo de Rótulo: (Word é mais curta que o rótulo)
             # Ex: Inserindo "car" e o nó é "cartoon". (mismatch_idx < len(child_label))
             # ----------------------------------------------------
-            elif mismatch_idx == len(remaining_word):
+            elif mismatch_idx == remaining_length:
                 
                 # 1. Cria o novo nó (para a palavra prefixo, ex: "car")
                 new_node = TrieNode()
-                new_node.label = remaining_word
+                new_node.label = word[pos:]
                 new_node.is_terminal = True
-                new_node.inverted_index.append((doc_id, frequency))
                 
                 # 2. Atualiza o nó antigo (o restante, ex: "toon")
                 remaining_label = child_label[mismatch_idx:]
@@ -99,7 +163,7 @@ class CompactTrie:
                 
                 # 4. Liga o novo nó (new_node) ao nó atual
                 current_node.children[char] = new_node
-                return
+                return new_node
             
             # ----------------------------------------------------
             # C. Rótulo é Prefixo de Word: (Word é mais longa que o rótulo)
@@ -109,7 +173,7 @@ class CompactTrie:
                 
                 # Continua a busca a partir do nó filho
                 current_node = child_node
-                remaining_word = remaining_word[mismatch_idx:]
+                pos += mismatch_idx
                 
             # ----------------------------------------------------
             # D. Divergência e Split (Prefixos comuns e restos)
@@ -127,17 +191,16 @@ class CompactTrie:
                 split_node.children[child_node.label[0]] = child_node
                 
                 # 4. O restante da nova palavra vira um novo nó filho
-                new_word_part = remaining_word[mismatch_idx:]
+                new_word_part = word[pos + mismatch_idx:]
                 new_node = TrieNode()
                 new_node.label = new_word_part
                 new_node.is_terminal = True
-                new_node.inverted_index.append((doc_id, frequency))
                 
                 split_node.children[new_word_part[0]] = new_node
                 
                 # 5. Liga o nó de divisão ao nó atual
                 current_node.children[char] = split_node
-                return
+                return new_node
     
     def find(self, word: str) -> list:
         """
@@ -147,25 +210,50 @@ class CompactTrie:
         
         A lista de ocorrências tem o formato: [(DocID, Frequência), ...]
         """
+        node = self._find_node(word)
+        if node is None:
+            return []
+        return list(zip(node.doc_ids, node.frequencies))
+
+    def find_postings(self, word: str) -> tuple:
+        """
+        Busca uma palavra na Trie Compacta e retorna o índice invertido em colunas:
+        (doc_ids, frequencies), dois array('I') paralelos. Evita criar uma tupla
+        por ocorrência. Os arrays são os do próprio nó: não devem ser modificados.
+        Se a palavra não existir, retorna um par de colunas vazias compartilhado.
+        """
+        node = self._find_node(word)
+        if node is None:
+            return _NO_POSTINGS
+        return node.doc_ids, node.frequencies
+
+    def _find_node(self, word: str):
+        """Retorna o nó terminal que representa a palavra, ou None se ela não existir."""
         current_node = self.root
-        remaining_word = word
+        # Posição atual na palavra (o restante é word[pos:], sem fatiar)
+        pos = 0
+        word_length = len(word)
         
-        while remaining_word:
+        while pos < word_length:
             # Encontra o primeiro caractere da palavra restante
-            char = remaining_word[0]
+            char = word[pos]
             
             # 1. Se o caractere não estiver nos filhos, a palavra não existe na Trie
             if char not in current_node.children:
-                return []
+                return None
             
             # Pega o nó filho (candidato) e seu rótulo
             child_node = current_node.children[char]
             child_label = child_node.label
             
-            # 2. Verifica o ponto de concordância (prefixo comum)
-            mismatch_idx = self._find_mismatch_point(remaining_word, child_label)
+            # 2. Verifica o ponto de concordância (prefixo comum). O caso mais comum
+            # (rótulo inteiro é prefixo do restante) é resolvido sem chamada de função.
+            if word.startswith(child_label, pos):
+                mismatch_idx = len(child_label)
+            else:
+                mismatch_idx = self._find_mismatch_point(word, child_label, pos)
             
-            if mismatch_idx == len(remaining_word):
+            if mismatch_idx == word_length - pos:
                 # Caso A: A palavra inteira foi consumida.
                 # Ex: Busca por "car" em um nó com label "cartoon". Mismatch é 3.
                 
@@ -179,7 +267,6 @@ class CompactTrie:
                     # Mas se a palavra a ser buscada foi inteira, isso só ocorre se 
                     # a palavra for um termo terminal no nó atual.
                     current_node = child_node
-                    remaining_word = "" # Força saída do loop
                     break
                 
                 # Se a palavra é um prefixo estrito do rótulo do nó (ex: "car" de "cartoon"),
@@ -188,144 +275,337 @@ class CompactTrie:
                 # em um split.
                 # Portanto, se a busca termina aqui e não consumiu o rótulo inteiro,
                 # a palavra não existe como termo.
-                return []
+                return None
 
             elif mismatch_idx == len(child_label):
                 # Caso B: O rótulo do nó foi completamente consumido.
                 # Ex: Nó com label "comp", buscando "computador". Mismatch é 4.
                 # Continuamos a busca a partir do nó filho com o restante da palavra.
                 current_node = child_node
-                remaining_word = remaining_word[mismatch_idx:]
+                pos += mismatch_idx
                 
             else: 
                 # Caso C: Há um prefixo comum, mas a palavra restante E o rótulo do nó
                 # ainda possuem partes.
                 # Ex: Nó com label "computador", buscando "compra". Mismatch é 4.
                 # A palavra não existe, pois a continuação é "ra" e o nó exige "utador".
-                return []
+                return None
         
         # O loop terminou. Verificamos se o nó atual é terminal (representa uma palavra completa).
         if current_node.is_terminal:
-            return current_node.inverted_index
+            return current_node
         else:
-            return []
+            return None
         
-    def pre_order_serialize(self, node: TrieNode, file_handler):
+    def _flatten(self) -> tuple:
         """
-        Função auxiliar recursiva para serializar o nó e seus filhos em pré-ordem.
-        Formato de linha: 
-        <label>|<is_terminal (1/0)>|<num_children>|<inverted_index_string>
+        Achata a Trie em colunas paralelas (uma posição por nó).
+        Os filhos de cada nó ficam contíguos (um bloco de irmãos, ordenado pelo
+        caractere): basta guardar o índice do primeiro filho e a quantidade de filhos.
+        Os blocos são emitidos em profundidade: logo depois do bloco de filhos de um
+        nó vêm os blocos da subárvore do seu primeiro filho, e assim por diante. Assim
+        a descida por uma palavra fica numa região próxima do arquivo (menos páginas
+        do mmap), em vez de saltar de um nível inteiro da árvore para o seguinte.
         """
-        # Formata o índice invertido como uma string: "doc1,freq1;doc2,freq2;..."
-        index_str = ";".join([f"{doc},{freq}" for doc, freq in node.inverted_index])
+        label_offsets, label_lengths = array('I'), array('I')
+        first_child, child_counts = array('I'), array('I')
+        posting_offsets, posting_counts = array('I'), array('I')
+        doc_ids, frequencies = array('I'), array('I')
+        terminal_flags = bytearray()
+        first_bytes = bytearray()
+        labels = bytearray()
         
-        # Formato de saída: label | is_terminal | num_children | index_data
-        line = f"{node.label}|{1 if node.is_terminal else 0}|{len(node.children)}|{index_str}\n"
+        # 1. Ordem dos nós. A posição do nó em 'order' é o seu índice no arquivo;
+        # a pilha guarda as posições cujo bloco de filhos ainda não foi emitido.
+        order = [self.root]
+        first_child_of = [0]
+        stack = [0]
+        while stack:
+            i = stack.pop()
+            node = order[i]
+            first = len(order)
+            first_child_of[i] = first
+            for char in sorted(node.children.keys()):
+                order.append(node.children[char])
+                first_child_of.append(0)
+            # Empilhados ao contrário: o primeiro filho é expandido primeiro
+            stack.extend(range(len(order) - 1, first - 1, -1))
         
-        file_handler.write(line)
+        # 2. Colunas, na ordem definida acima
+        for i, node in enumerate(order):
+            encoded_label = node.label.encode('utf-8')
+            label_offsets.append(len(labels))
+            label_lengths.append(len(encoded_label))
+            labels += encoded_label
+            first_bytes.append(encoded_label[0] if encoded_label else 0)
+            terminal_flags.append(1 if node.is_terminal else 0)
+            
+            posting_offsets.append(len(doc_ids))
+            posting_counts.append(len(node.doc_ids))
+            doc_ids.extend(node.doc_ids)
+            frequencies.extend(node.frequencies)
+            
+            first_child.append(first_child_of[i])
+            child_counts.append(len(node.children))
         
-        # Percorre os filhos em uma ordem consistente (ordenado por chave)
-        for char in sorted(node.children.keys()):
-            child_node = node.children[char]
-            self.pre_order_serialize(child_node, file_handler)
+        return (label_offsets, label_lengths, first_child, child_counts,
+                posting_offsets, posting_counts, doc_ids, frequencies,
+                terminal_flags, first_bytes, labels)
             
     def save_to_file(self, filename: str):
         """
-        Persiste a CompactTrie em disco usando um formato de texto próprio.
+        Persiste a CompactTrie em disco no formato binário plano (ver FlatTrie).
         """
         print(f"Salvando índice para {filename}...")
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                self.pre_order_serialize(self.root, f)
+            sections = self._flatten()
+            node_count = len(sections[0])
+            posting_count = len(sections[6])
+            label_bytes = len(sections[-1])
+            
+            # Grava num arquivo temporário ao lado do destino e só então o substitui:
+            # truncar no lugar um índice que esteja mapeado (FlatTrie) derrubaria o
+            # processo que o lê (SIGBUS) ao acessar as páginas que deixaram de existir.
+            temp_filename = filename + '.tmp'
+            try:
+                with open(temp_filename, 'wb') as f:
+                    f.write(FLAT_HEADER.pack(FLAT_MAGIC, FLAT_VERSION, node_count, posting_count, label_bytes))
+                    for section in sections:
+                        f.write(section)
+                os.replace(temp_filename, filename)
+            except BaseException:
+                if os.path.exists(temp_filename):
+                    os.remove(temp_filename)
+                raise
             print("Salvamento concluído.")
         except Exception as e:
             print(f"Erro ao salvar o índice: {e}")
             
     def load_from_file(self, filename: str):
         """
-        Carrega a CompactTrie do disco, reconstruindo a estrutura em memória.
+        Carrega a CompactTrie do disco, reconstruindo a estrutura em memória
+        a partir do formato binário plano.
         """
         print(f"Carregando índice de {filename}...")
         
-        # Lista de nós (tuplas: (nó pai, quantos filhos ainda faltam ler para ele))
-        stack = [] 
-        
-        # Recria a raiz
-        self.root = TrieNode()
-        current_node = self.root # Começamos a reconstruir a partir da raiz
-        
+        flat = FlatTrie()
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                
-                # O primeiro nó lido SEMPRE é a raiz
-                first_line = f.readline()
-                if not first_line:
-                    return # Arquivo vazio
-                
-                # Processa a linha da raiz
-                label, is_terminal_str, num_children_str, index_str = first_line.strip().split('|')
-                
-                # A raiz tem label vazio e não é terminal (a menos que o corpus tenha uma palavra vazia)
-                self.root.label = label 
-                self.root.is_terminal = is_terminal_str == '1'
-                num_children = int(num_children_str)
-                
-                # Processa o índice invertido (se houver)
-                if index_str:
-                    for item in index_str.split(';'):
-                        doc_id, freq = map(int, item.split(','))
-                        self.root.inverted_index.append((doc_id, freq))
+            flat._open(filename)
+            
+            # Copia cada coluna do arquivo de uma só vez (em C); o laço por nó
+            # abaixo só fatia essas cópias, sem indexar as visões do mmap.
+            labels = flat.labels.tobytes()
+            label_offsets = flat.label_offsets.tolist()
+            label_lengths = flat.label_lengths.tolist()
+            terminal_flags = flat.terminal_flags.tobytes()
+            posting_offsets = flat.posting_offsets.tolist()
+            posting_counts = flat.posting_counts.tolist()
+            doc_ids = array('I', flat.doc_ids)
+            frequencies = array('I', flat.frequencies)
+            
+            # 1. Cria um nó por posição do arquivo
+            nodes = []
+            for i in range(flat.node_count):
+                node = TrieNode()
+                offset = label_offsets[i]
+                node.label = labels[offset:offset + label_lengths[i]].decode('utf-8')
+                node.is_terminal = terminal_flags[i] == 1
                 
-                if num_children > 0:
-                    stack.append((self.root, num_children))
+                start = posting_offsets[i]
+                end = start + posting_counts[i]
+                node.doc_ids = doc_ids[start:end]
+                node.frequencies = frequencies[start:end]
+                nodes.append(node)
+            
+            # 2. Reconecta na árvore. A chave do 'children' é o primeiro caractere do rótulo
+            first_child = flat.first_child.tolist()
+            child_counts = flat.child_counts.tolist()
+            for i, node in enumerate(nodes):
+                first = first_child[i]
+                for child_node in nodes[first:first + child_counts[i]]:
+                    node.children[child_node.label[0]] = child_node
+            
+            self.root = nodes[0]
+            print("Carregamento concluído.")
+            return True
+            
+        except FileNotFoundError:
+            print(f"Arquivo {filename} não encontrado. Nenhuma Trie carregada.")
+            return False
+        except Exception as e:
+            print(f"Erro ao carregar ou desserializar o índice: {e}")
+            return False
+        finally:
+            # Tudo já foi copiado para a árvore: o mapeamento não é mais necessário
+            flat.close()
+
 
-                # Processa os nós restantes
-                for line in f:
-                    # Se a pilha de pais estiver vazia, algo está errado na estrutura
-                    if not stack:
-                        break 
-                        
-                    # O nó que está sendo processado é filho do pai no topo da pilha
-                    parent_node, remaining_children = stack[-1] 
-                    
-                    # 1. Parsing da linha
-                    label, is_terminal_str, num_children_str, index_str = line.strip().split('|')
-                    
-                    # 2. Criação do novo nó
-                    new_node = TrieNode()
-                    new_node.label = label
-                    new_node.is_terminal = is_terminal_str == '1'
-                    new_node.children = {}
-                    new_node.inverted_index = []
-                    num_children = int(num_children_str)
-                    
-                    # 3. Processa o índice invertido
-                    if index_str:
-                        for item in index_str.split(';'):
-                            doc_id, freq = map(int, item.split(','))
-                            new_node.inverted_index.append((doc_id, freq))
+class FlatTrie:
+    """
+    Visão somente leitura de uma CompactTrie salva em disco, usada nas consultas.
+    
+    O arquivo é mapeado em memória (mmap) e as buscas percorrem diretamente as
+    colunas do arquivo: não há um objeto Python por nó e nada é copiado na carga.
+    
+    Formato (inteiros na ordem de bytes nativa da máquina que gerou o índice):
+        cabeçalho: magic 'CTRI', versão, nº de nós, nº de ocorrências, bytes de rótulos
+        uint32[nós]  label_offsets, label_lengths, first_child, child_counts,
+                     posting_offsets, posting_counts
+        uint32[ocorrências]  doc_ids, frequencies
+        uint8[nós]   terminal_flags, first_bytes (1º byte do rótulo, chave de busca)
+        bytes        labels (rótulos em UTF-8, concatenados)
+    Os filhos de um nó são contíguos e ordenados; os blocos de irmãos seguem a ordem
+    em profundidade (ver CompactTrie._flatten).
+    """
+    # Visões (memoryview) sobre o arquivo mapeado, liberadas em close()
+    _COLUMNS = ('label_offsets', 'label_lengths', 'first_child', 'child_counts',
+                'posting_offsets', 'posting_counts', 'doc_ids', 'frequencies',
+                'terminal_flags', 'first_bytes', 'labels', '_view')
 
-                    # 4. Reconecta na árvore
-                    # Liga o novo nó ao nó pai. A chave do 'children' é o primeiro caractere do rótulo
-                    parent_node.children[new_node.label[0]] = new_node
-                    
-                    # 5. Atualiza a pilha de pais
-                    remaining_children -= 1
-                    if remaining_children == 0:
-                        stack.pop() # Todos os filhos do pai foram lidos
-                    else:
-                        stack[-1] = (parent_node, remaining_children) # Atualiza a contagem
-                        
-                    # Se o novo nó tem filhos, ele se torna o próximo pai
-                    if num_children > 0:
-                        stack.append((new_node, num_children))
-                        
+    def __init__(self):
+        self.node_count = 0
+        self._mmap = None
+
+    def close(self):
+        """Libera as visões das colunas e fecha o mapeamento do arquivo (se houver)."""
+        self.node_count = 0
+        for name in self._COLUMNS:
+            column = self.__dict__.pop(name, None)
+            if column is not None:
+                column.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Ainda há colunas devolvidas por find_postings em uso: o mapeamento
+                # é desfeito quando a última delas for descartada.
+                pass
+            self._mmap = None
+
+    def _open(self, filename: str):
+        """Mapeia o arquivo e cria as visões (memoryview) de cada coluna. Lança exceção em caso de erro."""
+        # Reabrir descarta o mapeamento anterior
+        self.close()
+        with open(filename, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        view = memoryview(mapped)
+        if len(view) < FLAT_HEADER.size:
+            raise ValueError("arquivo de índice truncado")
+        magic, version, node_count, posting_count, label_bytes = FLAT_HEADER.unpack_from(view)
+        if magic != FLAT_MAGIC or version != FLAT_VERSION:
+            raise ValueError("formato de índice desconhecido (gere o índice novamente)")
+        
+        offset = FLAT_HEADER.size
+        def take(size, fmt):
+            nonlocal offset
+            section = view[offset:offset + size]
+            if len(section) != size:
+                raise ValueError("arquivo de índice truncado")
+            offset += size
+            return section.cast(fmt) if fmt != 'B' else section
+        
+        node_bytes = node_count * 4
+        posting_bytes = posting_count * 4
+        self.label_offsets = take(node_bytes, 'I')
+        self.label_lengths = take(node_bytes, 'I')
+        self.first_child = take(node_bytes, 'I')
+        self.child_counts = take(node_bytes, 'I')
+        self.posting_offsets = take(node_bytes, 'I')
+        self.posting_counts = take(node_bytes, 'I')
+        self.doc_ids = take(posting_bytes, 'I')
+        self.frequencies = take(posting_bytes, 'I')
+        self.terminal_flags = take(node_count, 'B')
+        self.first_bytes = take(node_count, 'B')
+        self.labels = take(label_bytes, 'B')
+        
+        # A raiz tem um filho por letra inicial, então a busca entre eles é indexada
+        # direto pelo byte: os filhos com primeiro byte b estão em
+        # [root_children[b], root_children[b + 1]).
+        self._root_children = array('I')
+        if node_count:
+            first = self.first_child[0]
+            last = first + self.child_counts[0]
+            self._root_children.extend(
+                bisect_left(self.first_bytes, byte, first, last) for byte in range(257)
+            )
+        
+        self.node_count = node_count
+        self._view = view
+        self._mmap = mapped
+
+    def load_from_file(self, filename: str):
+        """Abre um índice salvo por CompactTrie.save_to_file."""
+        print(f"Carregando índice de {filename}...")
+        try:
+            self._open(filename)
             print("Carregamento concluído.")
             return True
-            
         except FileNotFoundError:
             print(f"Arquivo {filename} não encontrado. Nenhuma Trie carregada.")
             return False
         except Exception as e:
             print(f"Erro ao carregar ou desserializar o índice: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def _find_node(self, word: str) -> int:
+        """Retorna o índice do nó terminal que representa a palavra, ou -1 se ela não existir."""
+        if not self.node_count:
+            return -1
+        
+        encoded_word = word.encode('utf-8')
+        word_length = len(encoded_word)
+        first_bytes = self.first_bytes
+        labels = self.labels
+        
+        node = 0
+        pos = 0
+        while pos < word_length:
+            key = encoded_word[pos]
+            if node == 0:
+                # Raiz: tabela direta por byte, sem busca binária
+                child = self._root_children[key]
+                last = self._root_children[key + 1]
+            else:
+                # Os filhos do nó estão em [first, last), ordenados pelo primeiro byte do rótulo
+                first = self.first_child[node]
+                last = first + self.child_counts[node]
+                child = bisect_left(first_bytes, key, first, last)
+            
+            # Caracteres multibyte diferentes podem ter o mesmo byte inicial, então
+            # testamos todos os irmãos com esse byte: o rótulo (inteiro) tem de ser
+            # prefixo do restante da palavra, como na CompactTrie.
+            while child < last and first_bytes[child] == key:
+                offset = self.label_offsets[child]
+                length = self.label_lengths[child]
+                if encoded_word.startswith(labels[offset:offset + length], pos):
+                    break
+                child += 1
+            else:
+                return -1
+            
+            node = child
+            pos += length
+        
+        return node if self.terminal_flags[node] else -1
+
+    def find(self, word: str) -> list:
+        """
+        Busca uma palavra. Retorna a lista de ocorrências [(DocID, Frequência), ...]
+        ou uma lista vazia caso a palavra não exista.
+        """
+        doc_ids, frequencies = self.find_postings(word)
+        return list(zip(doc_ids, frequencies))
+
+    def find_postings(self, word: str) -> tuple:
+        """
+        Busca uma palavra e retorna o índice invertido em colunas (doc_ids, frequencies).
+        As colunas são visões diretas do arquivo mapeado (somente leitura, sem cópia).
+        Se a palavra não existir, retorna um par de colunas vazias compartilhado.
+        """
+        node = self._find_node(word)
+        if node < 0:
+            return _NO_POSTINGS
+        start = self.posting_offsets[node]
+        end = start + self.posting_counts[node]
+        return self.doc_ids[start:end], self.frequencies[start:end]
@@ -1,11 +1,21 @@
 import os
-import re
 import json
-from collections import defaultdict
+from array import array
+from collections import Counter
 import math
+import operator
+try:
+    # Parser JSON implementado em C (opcional); sem ele, usa o json da biblioteca padrão
+    import orjson
+except ImportError:
+    orjson = None
 # Importa as suas classes CompactTrie e TrieNode
 from compact_trie import CompactTrie, TrieNode 
 
+# Tabela de tokenização sobre os bytes UTF-8 do texto: as letras a-z são mantidas e
+# qualquer outro byte (pontuação, dígitos, bytes de caracteres não ASCII) vira espaço
+TOKEN_TABLE = bytes(byte if 0x61 <= byte <= 0x7A else 0x20 for byte in range(256))
+
 class Indexer:
     """
     Módulo responsável por orquestrar a indexação.
@@ -13,7 +23,7 @@ class Indexer:
     e Cálculo de Estatísticas Globais (Mu, Sigma) para o Z-score.
     """
     
-    def __init__(self, corpus_path: str, trie_file="inverted_index.txt", map_file="doc_id_map.json", stats_file="global_stats.json"):
+    def __init__(self, corpus_path: str, trie_file="inverted_index.bin", map_file="doc_id_map.json", stats_file="global_stats.json"):
         self.corpus_path = corpus_path
         self.trie_file = trie_file
         self.map_file = map_file
@@ -34,18 +44,16 @@ class Indexer:
             
             # 2. Carregar Mapeamento
             try:
-                with open(self.map_file, 'r', encoding='utf-8') as f:
-                    doc_map_str = json.load(f)
-                    self.doc_map = {int(k): v for k, v in doc_map_str.items()}
-                    self.total_docs = len(self.doc_map)
+                doc_map_str = self._read_json(self.map_file)
+                self.doc_map = {int(k): v for k, v in doc_map_str.items()}
+                self.total_docs = len(self.doc_map)
             except (FileNotFoundError, json.JSONDecodeError, ValueError):
                 print("Mapeamento não encontrado, corrompido ou vazio.")
             
             # 3. Carregar Estatísticas Z-score
             try:
-                with open(self.stats_file, 'r', encoding='utf-8') as f:
-                    # As estatísticas salvas são as FINAIS (Mu, Sigma, DF)
-                    self.global_stats = json.load(f)
+                # As estatísticas salvas são as FINAIS (Mu, Sigma, DF)
+                self.global_stats = self._read_json(self.stats_file)
             except (FileNotFoundError, json.JSONDecodeError, ValueError):
                 print("Estatísticas não encontradas, corrompidas ou vazias.")
 
@@ -56,17 +64,32 @@ class Indexer:
         print("Iniciando indexação a partir do zero.")
         return False
 
+    def _read_json(self, filename):
+        """Lê um arquivo JSON de uma só vez, com o orjson quando disponível."""
+        with open(filename, 'rb') as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson else json.loads(raw)
+
+    def _write_json(self, filename, data):
+        """Grava um arquivo JSON de uma só vez, com o orjson quando disponível."""
+        if orjson:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4)
+
     def _tokenize_and_calculate_tf(self, text):
         """Converte o texto em tokens (limpeza básica) e calcula a Frequência do Termo (TF)."""
         text = text.lower()
-        # Encontra todas as sequências de letras minúsculas (a-z)
-        tokens = re.findall(r'[a-z]+', text)
+        # Encontra todas as sequências de letras minúsculas (a-z). Equivale a
+        # re.findall(r'[a-z]+', text): em UTF-8, caracteres não ASCII só usam bytes
+        # >= 0x80, que a tabela transforma em espaço. translate e split rodam em C.
+        encoded = text.encode('utf-8', errors='replace')
+        tokens = encoded.translate(TOKEN_TABLE).decode('ascii').split()
         
-        term_frequency = defaultdict(int)
-        for token in tokens:
-            term_frequency[token] += 1
-            
-        return term_frequency
+        # A contagem do Counter é feita em C, sem um laço Python por token
+        return Counter(tokens)
 
     def index_corpus(self):
         """Orquestra o processamento do corpus, construção da Trie e cálculo de dados Z-score."""
@@ -76,10 +99,12 @@ class Indexer:
         
         doc_id_counter = 1
         
-        # Passagem 1: Leitura, Inserção na Trie e Coleta de Dados Brutos (Sum TF e Sum TF²)
+        # Passagem 1: Leitura e Coleta do Índice Invertido de cada termo
         
-        # Estrutura para coleta BRUTA (só é usada durante a construção, depois é convertida)
-        raw_stats = {} 
+        # Índice invertido de cada termo, acumulado em colunas (DocIDs, TFs) e inserido
+        # na Trie de uma só vez ao final: cada termo percorre a Trie uma única vez.
+        # As colunas de TF também são os dados brutos do Z-score (Sum TF, Sum TF², DF).
+        postings = {}
 
         print("Passagem 1: Lendo documentos e construindo a Trie...")
         
@@ -103,16 +128,12 @@ class Indexer:
                         
                         for term, tf in term_frequencies.items():
                             
-                            # 1. Inserção na CompactTrie
-                            self.trie.insert(term, doc_id, tf)
-                            
-                            # 2. Coleta de dados brutos
-                            if term not in raw_stats:
-                                raw_stats[term] = {'sum_tf': 0, 'sum_tf2': 0, 'df': 0}
-
-                            raw_stats[term]['df'] += 1 
-                            raw_stats[term]['sum_tf'] += tf
-                            raw_stats[term]['sum_tf2'] += (tf ** 2)
+                            # Acumula a ocorrência para a CompactTrie e para o Z-score
+                            if term not in postings:
+                                postings[term] = (array('I'), array('I'))
+                            doc_ids, frequencies = postings[term]
+                            doc_ids.append(doc_id)
+                            frequencies.append(tf)
                             
                         self.total_docs = doc_id
                         if doc_id % 200 == 0:
@@ -121,22 +142,32 @@ class Indexer:
                     except Exception as e:
                         print(f"Erro ao processar o arquivo {file_path_full}: {e}")
 
+        # Inserção em lote na CompactTrie
+        self.trie.insert_many(
+            (term, doc_ids, frequencies) for term, (doc_ids, frequencies) in postings.items()
+        )
+
         # Passagem 2: Cálculo de Estatísticas Finais e Salvamento
-        self._calculate_and_save_stats(raw_stats)
+        self._calculate_and_save_stats(postings)
+        postings.clear()
         print("Módulo de Indexação encerrado.")
 
-    def _calculate_and_save_stats(self, raw_stats):
-        """Calcula a Média (mu) e o Desvio-Padrão (sigma) para cada termo e salva tudo."""
+    def _calculate_and_save_stats(self, postings):
+        """
+        Calcula a Média (mu) e o Desvio-Padrão (sigma) para cada termo e salva tudo.
+        Os dados brutos saem direto da coluna de TFs de cada termo: uma soma por
+        termo feita em C, em vez de atualizar contadores a cada ocorrência.
+        """
         
         num_docs = self.total_docs
         print(f"\nCalculando estatísticas finais para {num_docs} documentos...")
         
         final_stats = {}
-        for term, data in raw_stats.items():
+        for term, (_, frequencies) in postings.items():
             
-            sum_tf = data['sum_tf']
-            sum_tf2 = data['sum_tf2']
-            df = data['df'] # Document Frequency
+            sum_tf = sum(frequencies)
+            sum_tf2 = sum(map(operator.mul, frequencies, frequencies))
+            df = len(frequencies) # Document Frequency
             
             # Cálculo da Média (Mu) sobre a frequência nos documentos que contêm o termo (DF)
             mu = sum_tf / df if df > 0 else 0 
@@ -163,13 +194,11 @@ class Indexer:
         print(f"Índice invertido salvo em: {self.trie_file}")
         
         # 2. Salva o Mapeamento de Documentos
-        with open(self.map_file, 'w', encoding='utf-8') as f:
-            json.dump({str(k): v for k, v in self.doc_map.items()}, f, indent=4)
+        self._write_json(self.map_file, {str(k): v for k, v in self.doc_map.items()})
         print(f"Mapeamento salvo em: {self.map_file}")
 
         # 3. Salva as Estatísticas Globais (Z-score data)
-        with open(self.stats_file, 'w', encoding='utf-8') as f:
-            json.dump(self.global_stats, f, indent=4)
+        self._write_json(self.stats_file, self.global_stats)
         print(f"Estatísticas Z-score salvas em: {self.stats_file}")
 
 # --- Exemplo de Uso (Simulação) ---
@@ -1,16 +1,32 @@
 import os
 import shutil
+import sys
 import json
+import time
+from contextlib import contextmanager
 from indexer import Indexer
 from RI import InformationRetriever
-from compact_trie import CompactTrie # Para verificação direta da estrutura
+from compact_trie import CompactTrie, FlatTrie # Para verificação direta da estrutura
 
 # --- CONFIGURAÇÃO ---
 TEST_CORPUS_FOLDER = "test_corpus_temp"
-TEST_TRIE_FILE = "test_trie.txt"
+TEST_TRIE_FILE = "test_trie.bin"
+TEST_ROUND_TRIP_FILE = "test_round_trip.bin"
 TEST_MAP_FILE = "test_map.json"
 TEST_STATS_FILE = "test_stats.json"
 
+# Duração (em ns) de cada fase do teste, na ordem de execução
+TIMINGS = []
+
+@contextmanager
+def phase(name):
+    """Mede a duração de uma fase do teste (perf_counter_ns) e registra em TIMINGS."""
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        TIMINGS.append((name, time.perf_counter_ns() - start))
+
 def setup_test_corpus():
     """Cria uma estrutura de documentos de teste."""
     if os.path.exists(TEST_CORPUS_FOLDER):
@@ -33,6 +49,75 @@ def setup_test_corpus():
 
     print("--- 1. SETUP: Corpus de teste criado. ---")
 
+def test_trie_round_trip():
+    """Testa a ida e volta da Trie pelo disco (save_to_file -> FlatTrie / load_from_file)."""
+    print("\n--- 1.1 TESTE DA TRIE EM DISCO ---")
+    
+    # 'é' e 'ê' começam pelo mesmo byte em UTF-8 (0xC3): rótulos irmãos com o
+    # mesmo primeiro byte, tanto sob a raiz quanto sob um nó interno ('caf').
+    expected = {
+        'car': [(1, 1)],
+        'carro': [(1, 3), (2, 2)],
+        'casa': [(2, 3), (3, 3)],
+        'café': [(4, 1)],
+        'cafê': [(5, 2)],
+        'éa': [(6, 1)],
+        'êb': [(7, 4)],
+    }
+    # Prefixos, extensões e palavras ausentes não devem ser encontrados
+    missing = ['', 'c', 'ca', 'caf', 'cafe', 'carr', 'carros', 'é', 'ê', 'éb', 'x']
+    
+    trie = CompactTrie()
+    for word, postings in expected.items():
+        for doc_id, frequency in postings:
+            trie.insert(word, doc_id, frequency)
+    trie.save_to_file(TEST_ROUND_TRIP_FILE)
+    
+    flat = FlatTrie()
+    loaded = CompactTrie()
+    try:
+        assert flat.load_from_file(TEST_ROUND_TRIP_FILE), "FlatTrie não carregou o arquivo"
+        assert loaded.load_from_file(TEST_ROUND_TRIP_FILE), "CompactTrie não carregou o arquivo"
+        for word, postings in expected.items():
+            assert flat.find(word) == postings, f"FlatTrie.find('{word}'): esperado {postings}, obtido {flat.find(word)}"
+            doc_ids, frequencies = flat.find_postings(word)
+            assert list(zip(doc_ids, frequencies)) == postings, f"FlatTrie.find_postings('{word}') incorreto"
+            assert loaded.find(word) == postings, f"CompactTrie.find('{word}'): esperado {postings}, obtido {loaded.find(word)}"
+        for word in missing:
+            assert flat.find(word) == [], f"FlatTrie.find('{word}') deveria ser vazio, obtido {flat.find(word)}"
+            assert loaded.find(word) == [], f"CompactTrie.find('{word}') deveria ser vazio, obtido {loaded.find(word)}"
+        print(f"[OK] Ida e volta da Trie ({len(expected)} palavras, incluindo rótulos 'é'/'ê').")
+    except AssertionError as e:
+        print(f"[FALHA] Ida e volta da Trie: {e}")
+        return False
+    finally:
+        flat.close()
+    
+    # Uma cadeia 'a', 'aa', 'aaa', ... gera uma Trie mais profunda que o limite
+    # de recursão do Python: salvar e carregar não podem depender de recursão.
+    depth = sys.getrecursionlimit() + 100
+    deep_trie = CompactTrie()
+    for length in range(1, depth + 1):
+        deep_trie.insert('a' * length, length, 1)
+    deep_trie.save_to_file(TEST_ROUND_TRIP_FILE)
+    
+    flat = FlatTrie()
+    loaded = CompactTrie()
+    try:
+        assert flat.load_from_file(TEST_ROUND_TRIP_FILE), "FlatTrie não carregou o arquivo"
+        assert loaded.load_from_file(TEST_ROUND_TRIP_FILE), "CompactTrie não carregou o arquivo"
+        deepest = 'a' * depth
+        assert flat.find(deepest) == [(depth, 1)], f"FlatTrie.find na profundidade {depth} incorreto"
+        assert loaded.find(deepest) == [(depth, 1)], f"CompactTrie.find na profundidade {depth} incorreto"
+        assert flat.find(deepest + 'a') == [], "FlatTrie.find além da cadeia deveria ser vazio"
+        print(f"[OK] Ida e volta de uma Trie com {depth} níveis (acima do limite de recursão).")
+        return True
+    except AssertionError as e:
+        print(f"[FALHA] Ida e volta da Trie: {e}")
+        return False
+    finally:
+        flat.close()
+
 def test_indexation_and_persistence():
     """Testa a indexação completa e a persistência dos 3 arquivos."""
     
@@ -171,6 +256,8 @@ def cleanup():
         shutil.rmtree(TEST_CORPUS_FOLDER)
     if os.path.exists(TEST_TRIE_FILE):
         os.remove(TEST_TRIE_FILE)
+    if os.path.exists(TEST_ROUND_TRIP_FILE):
+        os.remove(TEST_ROUND_TRIP_FILE)
     if os.path.exists(TEST_MAP_FILE):
         os.remove(TEST_MAP_FILE)
     if os.path.exists(TEST_STATS_FILE):
@@ -179,10 +266,20 @@ def cleanup():
 
 if __name__ == '__main__':
     try:
-        setup_test_corpus()
-        if test_indexation_and_persistence():
-            test_information_retrieval()
+        with phase("setup"):
+            setup_test_corpus()
+        # Independente do corpus: roda mesmo que a indexação falhe adiante
+        with phase("trie"):
+            test_trie_round_trip()
+        with phase("indexacao"):
+            indexed = test_indexation_and_persistence()
+        if indexed:
+            with phase("recuperacao"):
+                test_information_retrieval()
         else:
             print("\nTeste interrompido devido a falha na Indexação/Persistência.")
     finally:
-        cleanup()
\ No newline at end of file
+        with phase("limpeza"):
+            cleanup()
+        # Uma única linha com os tempos, para comparar execuções
+        print(f"TEMPOS (ns): {json.dumps(dict(TIMINGS))}")
\ No newline at end of file